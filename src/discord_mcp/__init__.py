@@ -1,28 +1,110 @@
 """Discord integration for Model Context Protocol."""
 
-from . import server
 import asyncio
-import warnings
-import tracemalloc
+import os
+import signal
+import sys
+import traceback
 
 __version__ = "0.1.0"
 
+def _loop_factory():
+    """Return uvloop's event loop factory, or None to use asyncio's default loop."""
+    try:
+        import uvloop
+    except ImportError:  # Windows, or uvloop not installed
+        return None
+    return uvloop.new_event_loop
+
+def _report(message):
+    """Write a diagnostic to stderr; stdout carries the MCP JSON-RPC stream."""
+    try:
+        sys.stderr.write(message)
+        sys.stderr.flush()
+    except BrokenPipeError:
+        # The parent went away; there is nobody left to tell.
+        pass
+
+def _report_error(error):
+    _report("Error running Discord MCP server:\n" + "".join(traceback.format_exception(error)))
+
+def _request_stop(stop):
+    if not stop.done():
+        stop.set_result(None)
+
+def _restore_signals(loop, signals):
+    for sig in signals:
+        loop.remove_signal_handler(sig)
+        # remove_signal_handler puts Python's KeyboardInterrupt handler back
+        # for SIGINT; use the OS default so a repeated signal always ends us
+        signal.signal(sig, signal.SIG_DFL)
+
+async def _serve(server):
+    """Run the server until the MCP session ends or SIGINT/SIGTERM arrives."""
+    loop = asyncio.get_running_loop()
+    stop = loop.create_future()
+    handled = []
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, _request_stop, stop)
+        except NotImplementedError:
+            # Windows: Ctrl+C still surfaces as KeyboardInterrupt in main()
+            pass
+        else:
+            handled.append(sig)
+    # Only the first signal asks for a clean shutdown
+    stop.add_done_callback(lambda _: _restore_signals(loop, handled))
+    error = None
+    try:
+        await server.main(stop=stop)
+    except Exception as e:
+        error = e
+    finally:
+        _restore_signals(loop, handled)
+
+    if asyncio.all_tasks() - {asyncio.current_task()}:
+        # server.main left the MCP session blocked reading stdin, which the
+        # host may keep open; asyncio.run would wait for it and the
+        # interpreter for the reader thread, so leave without them
+        if error is not None:
+            _report_error(error)
+        sys.stderr.flush()
+        os._exit(1 if error is not None else 0)
+    if error is not None:
+        raise error
+
 def main():
     """Main entry point for the package."""
-    # Enable tracemalloc for better debugging
-    tracemalloc.start()
-    
-    # Suppress PyNaCl warning since we don't use voice features
-    warnings.filterwarnings('ignore', module='discord.client', message='PyNaCl is not installed')
-    
+    from . import server
+
+    # Allocation tracing is opt-in: run with PYTHONTRACEMALLOC=N or
+    # -X tracemalloc=N and the interpreter starts it before we get here.
+
     try:
         # Properly handle async execution
-        asyncio.run(server.main())
+        loop_factory = _loop_factory()
+        if sys.version_info >= (3, 11):
+            with asyncio.Runner(loop_factory=loop_factory) as runner:
+                runner.run(_serve(server))
+        else:
+            # asyncio.Runner is 3.11+; on 3.10 install uvloop through the policy
+            if loop_factory is not None:
+                import uvloop
+                asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            asyncio.run(_serve(server))
     except KeyboardInterrupt:
-        print("\nShutting down Discord MCP server...")
+        _report("\nShutting down Discord MCP server...\n")
     except Exception as e:
-        print(f"Error running Discord MCP server: {e}")
-        raise
+        _report_error(e)
+        raise SystemExit(1) from None
+
+def __getattr__(name):
+    # Import the server module on first access so that importing the package
+    # (e.g. to read __version__) does not pull in discord.py and the MCP stack.
+    if name == "server":
+        import importlib
+        return importlib.import_module(".server", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Expose important items at package level
 __all__ = ['main', 'server']
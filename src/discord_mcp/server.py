@@ -1,10 +1,11 @@
 import asyncio
+import io
 import logging
 import os
-from datetime import datetime
-from functools import wraps
-from typing import Any, Dict, List, Optional
-import json
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import discord
 from discord.ext import commands
@@ -21,6 +22,9 @@ DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 if not DISCORD_TOKEN:
     raise ValueError("DISCORD_TOKEN environment variable is required")
 
+# Suppress the one-time PyNaCl notice since we don't use voice features
+discord.VoiceClient.warn_nacl = False
+
 # Initialize Discord bot with necessary intents
 intents = discord.Intents.default()
 intents.message_content = True
@@ -39,18 +43,61 @@ async def on_ready():
     discord_client = bot
     logger.info(f"Logged in as {bot.user.name}")
 
-# Helper function to ensure Discord client is ready
-def require_discord_client(func):
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        if not discord_client:
-            raise RuntimeError("Discord client not ready")
-        return await func(*args, **kwargs)
-    return wrapper
+# dm_conversation calls waiting for a reply, keyed by (channel ID, author ID)
+# so on_message finds them with one dict lookup instead of running a
+# wait_for check against every message the bot receives
+_dm_waiters: Dict[Tuple[int, int], List[asyncio.Future]] = {}
 
-@app.list_tools()
-async def list_tools() -> List[Tool]:
-    """List available Discord tools."""
+@bot.listen("on_message")
+async def _dispatch_dm_reply(message):
+    # A listener runs alongside commands.Bot.on_message, so prefix commands
+    # such as the default !help keep working
+    waiters = _dm_waiters.pop((message.channel.id, message.author.id), None)
+    if waiters:
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(message)
+
+# Resolve objects from discord.py's cache first and only fall back to a REST
+# call when they are not cached
+async def _resolve_channel(client: commands.Bot, channel_id: int):
+    return client.get_channel(channel_id) or await client.fetch_channel(channel_id)
+
+async def _resolve_guild(client: commands.Bot, guild_id: int) -> discord.Guild:
+    return client.get_guild(guild_id) or await client.fetch_guild(guild_id)
+
+# Users fetched over REST because discord.py doesn't cache them (no shared
+# guild), kept so repeated DMs to the same user skip the round trip. Nothing
+# updates these entries, so the cache is bounded (least recently used go
+# first) and only used where a User handle is enough, not for profile data.
+_USER_CACHE_SIZE = 1024
+_user_cache: "OrderedDict[int, discord.User]" = OrderedDict()
+
+async def _resolve_user(client: commands.Bot, user_id: int) -> discord.User:
+    user = client.get_user(user_id)
+    if user is not None:
+        return user
+    user = _user_cache.get(user_id)
+    if user is None:
+        user = _user_cache[user_id] = await client.fetch_user(user_id)
+        if len(_user_cache) > _USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+    else:
+        _user_cache.move_to_end(user_id)
+    return user
+
+async def _resolve_member(guild: discord.Guild, user_id: int) -> discord.Member:
+    return guild.get_member(user_id) or await guild.fetch_member(user_id)
+
+# Property schemas shared by several tools
+_SERVER_ID_PROP = {"type": "string", "description": "Discord server (guild) ID"}
+_CHANNEL_ID_PROP = {"type": "string", "description": "Discord channel ID"}
+_MESSAGE_CHANNEL_ID_PROP = {"type": "string", "description": "Channel containing the message"}
+_DM_USER_ID_PROP = {"type": "string", "description": "Discord user ID to send DM to"}
+_EMOJI_PROP = {"type": "string", "description": "Emoji to react with (Unicode or custom emoji ID)"}
+
+def _build_tools() -> List[Tool]:
+    """Build the static list of Discord tools."""
     # Define a common message schema for reuse
     message_schema = {
         "type": "object",
@@ -131,10 +178,7 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "server_id": {
-                        "type": "string",
-                        "description": "Discord server (guild) ID"
-                    }
+                    "server_id": _SERVER_ID_PROP
                 },
                 "required": ["server_id"]
             }
@@ -145,15 +189,17 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "server_id": {
-                        "type": "string",
-                        "description": "Discord server (guild) ID"
-                    },
+                    "server_id": _SERVER_ID_PROP,
                     "limit": {
                         "type": "number",
                         "description": "Maximum number of members to fetch",
                         "minimum": 1,
                         "maximum": 1000
+                    },
+                    "include_roles": {
+                        "type": "boolean",
+                        "description": "Include each member's role IDs",
+                        "default": True
                     }
                 },
                 "required": ["server_id"]
@@ -167,10 +213,7 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "server_id": {
-                        "type": "string",
-                        "description": "Discord server ID"
-                    },
+                    "server_id": _SERVER_ID_PROP,
                     "user_id": {
                         "type": "string",
                         "description": "User to add role to"
@@ -189,10 +232,7 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "server_id": {
-                        "type": "string",
-                        "description": "Discord server ID"
-                    },
+                    "server_id": _SERVER_ID_PROP,
                     "user_id": {
                         "type": "string",
                         "description": "User to remove role from"
@@ -213,10 +253,7 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "server_id": {
-                        "type": "string",
-                        "description": "Discord server ID"
-                    },
+                    "server_id": _SERVER_ID_PROP,
                     "name": {
                         "type": "string",
                         "description": "Channel name"
@@ -259,18 +296,12 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "Channel containing the message"
-                    },
+                    "channel_id": _MESSAGE_CHANNEL_ID_PROP,
                     "message_id": {
                         "type": "string",
                         "description": "Message to react to"
                     },
-                    "emoji": {
-                        "type": "string",
-                        "description": "Emoji to react with (Unicode or custom emoji ID)"
-                    }
+                    "emoji": _EMOJI_PROP
                 },
                 "required": ["channel_id", "message_id", "emoji"]
             }
@@ -281,20 +312,14 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "Channel containing the message"
-                    },
+                    "channel_id": _MESSAGE_CHANNEL_ID_PROP,
                     "message_id": {
                         "type": "string",
                         "description": "Message to react to"
                     },
                     "emojis": {
                         "type": "array",
-                        "items": {
-                            "type": "string",
-                            "description": "Emoji to react with (Unicode or custom emoji ID)"
-                        },
+                        "items": _EMOJI_PROP,
                         "description": "List of emojis to add as reactions"
                     }
                 },
@@ -307,10 +332,7 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "Channel containing the message"
-                    },
+                    "channel_id": _MESSAGE_CHANNEL_ID_PROP,
                     "message_id": {
                         "type": "string",
                         "description": "Message to remove reaction from"
@@ -329,10 +351,7 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "Discord channel ID"
-                    },
+                    "channel_id": _CHANNEL_ID_PROP,
                     **message_schema["properties"]
                 },
                 "required": ["channel_id"],
@@ -345,10 +364,7 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "channel_id": {
-                        "type": "string",
-                        "description": "Discord channel ID"
-                    },
+                    "channel_id": _CHANNEL_ID_PROP,
                     "limit": {
                         "type": "number",
                         "description": "Number of messages to fetch (max 100)",
@@ -409,10 +425,7 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "user_id": {
-                        "type": "string",
-                        "description": "Discord user ID to send DM to"
-                    },
+                    "user_id": _DM_USER_ID_PROP,
                     **message_schema["properties"]
                 },
                 "required": ["user_id"],
@@ -425,10 +438,7 @@ async def list_tools() -> List[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "user_id": {
-                        "type": "string",
-                        "description": "Discord user ID to send DM to"
-                    },
+                    "user_id": _DM_USER_ID_PROP,
                     "timeout": {
                         "type": "number",
                         "description": "Maximum time to wait for response in seconds",
@@ -442,569 +452,420 @@ async def list_tools() -> List[Tool]:
         )
     ]
 
-@app.call_tool()
-@require_discord_client
-async def call_tool(name: str, arguments: Any) -> List[TextContent]:
-    """Handle Discord tool calls."""
+# Tool definitions never change, so build them once and share the list
+_TOOLS = _build_tools()
+
+@app.list_tools()
+async def list_tools() -> List[Tool]:
+    """List available Discord tools."""
+    return _TOOLS
+
+def _text(text: str) -> List[TextContent]:
+    # Handler output is our own string, so skip pydantic validation
+    return [TextContent.model_construct(type="text", text=text)]
+
+@lru_cache(maxsize=1024)
+def _parse_ts(timestamp: str) -> datetime:
+    # Templated embeds tend to repeat the same timestamps
+    return datetime.fromisoformat(timestamp)
+
+def _normalize_embed(embed_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy an embed argument into the shape Embed.from_dict expects."""
+    data = {key: value for key, value in embed_data.items() if value is not None}
+    # The schema allows thumbnail/image objects without a URL; Discord doesn't
+    for key in ("thumbnail", "image"):
+        if key in data and "url" not in data[key]:
+            del data[key]
+    return data
+
+def _build_embed(embed_data: Dict[str, Any]) -> discord.Embed:
+    """Build a discord.Embed from the embed object in a tool's arguments."""
+    # The tool schema mirrors Discord's embed payload, so from_dict can take
+    # it as-is; only the timestamp goes through our parse cache
+    data = _normalize_embed(embed_data)
+    timestamp = data.pop("timestamp", None)
+    embed = discord.Embed.from_dict(data)
+    if timestamp:
+        embed.timestamp = _parse_ts(timestamp)
+    return embed
+
+def _build_embeds(embeds_data: List[Dict[str, Any]]) -> List[discord.Embed]:
+    return [_build_embed(embed_data) for embed_data in embeds_data]
+
+async def _handle_send_message(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    channel = await _resolve_channel(client, arguments["channel_id"])
     
-    if name == "send_message":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        
-        # Prepare kwargs for message sending
-        kwargs = {}
-        if "content" in arguments:
-            kwargs["content"] = arguments["content"]
-        
-        # Handle embeds if provided
-        if "embeds" in arguments and arguments["embeds"]:
-            embeds = []
-            for embed_data in arguments["embeds"]:
-                embed = discord.Embed()
-                
-                # Set basic embed properties
-                if "title" in embed_data:
-                    embed.title = embed_data["title"]
-                if "description" in embed_data:
-                    embed.description = embed_data["description"]
-                if "url" in embed_data:
-                    embed.url = embed_data["url"]
-                if "color" in embed_data:
-                    embed.color = embed_data["color"]
-                if "timestamp" in embed_data and embed_data["timestamp"]:
-                    embed.timestamp = datetime.fromisoformat(embed_data["timestamp"])
-                
-                # Set author if provided
-                if "author" in embed_data:
-                    name = embed_data["author"].get("name", "")
-                    url = embed_data["author"].get("url", None)
-                    icon_url = embed_data["author"].get("icon_url", None)
-                    embed.set_author(name=name, url=url, icon_url=icon_url)
-                
-                # Set footer if provided
-                if "footer" in embed_data:
-                    text = embed_data["footer"].get("text", "")
-                    icon_url = embed_data["footer"].get("icon_url", None)
-                    embed.set_footer(text=text, icon_url=icon_url)
-                
-                # Set thumbnail if provided
-                if "thumbnail" in embed_data and "url" in embed_data["thumbnail"]:
-                    embed.set_thumbnail(url=embed_data["thumbnail"]["url"])
-                
-                # Set image if provided
-                if "image" in embed_data and "url" in embed_data["image"]:
-                    embed.set_image(url=embed_data["image"]["url"])
-                
-                # Add fields if provided
-                if "fields" in embed_data:
-                    for field in embed_data["fields"]:
-                        embed.add_field(
-                            name=field.get("name", ""),
-                            value=field.get("value", ""),
-                            inline=field.get("inline", False)
-                        )
-                
-                embeds.append(embed)
-            
-            kwargs["embeds"] = embeds
-        
-        message = await channel.send(**kwargs)
-        return [TextContent(
-            type="text",
-            text=f"Message sent successfully. Message ID: {message.id}"
-        )]
-
-    elif name == "read_messages":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        limit = min(int(arguments.get("limit", 10)), 100)
-        fetch_users = arguments.get("fetch_reaction_users", False)  # Only fetch users if explicitly requested
-        messages = []
-        async for message in channel.history(limit=limit):
-            reaction_data = []
-            for reaction in message.reactions:
-                emoji_str = str(reaction.emoji.name) if hasattr(reaction.emoji, 'name') and reaction.emoji.name else str(reaction.emoji.id) if hasattr(reaction.emoji, 'id') else str(reaction.emoji)
-                reaction_info = {
-                    "emoji": emoji_str,
-                    "count": reaction.count
-                }
-                logger.error(f"Emoji: {emoji_str}")
-                reaction_data.append(reaction_info)
-            
-            # Process embeds explicitly to ensure all data is captured
-            embed_dicts = []
-            for embed in message.embeds:
-                embed_dict = {
-                    "title": embed.title,
-                    "description": embed.description,
-                    "url": embed.url,
-                    "color": embed.color.value if embed.color else None,
-                    "timestamp": embed.timestamp.isoformat() if embed.timestamp else None,
-                    "fields": [
-                        {
-                            "name": field.name,
-                            "value": field.value,
-                            "inline": field.inline
-                        } for field in embed.fields
-                    ]
-                }
-                
-                # Handle author
-                if embed.author:
-                    embed_dict["author"] = {
-                        "name": embed.author.name,
-                        "url": embed.author.url,
-                        "icon_url": embed.author.icon_url
-                    }
-                
-                # Handle footer
-                if embed.footer:
-                    embed_dict["footer"] = {
-                        "text": embed.footer.text,
-                        "icon_url": embed.footer.icon_url
-                    }
-                
-                # Handle images
-                if embed.thumbnail:
-                    embed_dict["thumbnail"] = {"url": embed.thumbnail.url}
-                
-                if embed.image:
-                    embed_dict["image"] = {"url": embed.image.url}
-                
-                embed_dicts.append(embed_dict)
-
-            messages.append({
-                "id": str(message.id),
-                "author": str(message.author),
-                "content": message.content,
-                "timestamp": message.created_at.isoformat(),
-                "reactions": reaction_data,  # Add reactions to message dict
-                "embeds": embed_dicts  # Add embeds to message dict
-            })
-        
-        # Format the output string
-        message_lines = []
-        for m in messages:
-            reactions_str = (
-                ", ".join([f"{r['emoji']}({r['count']})" for r in m["reactions"]])
-                if m["reactions"]
-                else "No reactions"
-            )
-            
-            # Format embeds more clearly
-            embeds_str = ""
-            if m['embeds']:
-                embeds_str = "\nEmbeds:"
-                for i, embed in enumerate(m['embeds']):
-                    embeds_str += f"\n  Embed {i+1}:"
-                    if embed.get('title'):
-                        embeds_str += f"\n    Title: {embed['title']}"
-                    if embed.get('description'):
-                        embeds_str += f"\n    Description: {embed['description']}"
-                    if embed.get('url'):
-                        embeds_str += f"\n    URL: {embed['url']}"
-                    if embed.get('color'):
-                        embeds_str += f"\n    Color: {embed['color']}"
-                    if embed.get('timestamp'):
-                        embeds_str += f"\n    Timestamp: {embed['timestamp']}"
-                    
-                    if embed.get('author'):
-                        embeds_str += f"\n    Author: {embed['author'].get('name', '')}"
-                    
-                    if embed.get('footer'):
-                        embeds_str += f"\n    Footer: {embed['footer'].get('text', '')}"
-                    
-                    if embed.get('thumbnail'):
-                        embeds_str += f"\n    Thumbnail: {embed['thumbnail'].get('url', '')}"
-                    
-                    if embed.get('image'):
-                        embeds_str += f"\n    Image: {embed['image'].get('url', '')}"
-                    
-                    if embed.get('fields'):
-                        embeds_str += "\n    Fields:"
-                        for field in embed['fields']:
-                            embeds_str += f"\n      {field['name']}: {field['value']} ({'Inline' if field.get('inline') else 'Not inline'})"
-            
-            message_lines.append(
-                f"{m['author']} ({m['timestamp']}): {m['content']}\n"
-                f"Reactions: {reactions_str}"
-                f"{embeds_str}" 
-            )
-        
-        output_text = f"Retrieved {len(messages)} messages:\n\n" + "\n━━━━━━━━━━━━━━━━━━━━━━\n".join(message_lines) # Separator for clarity
-
-        return [TextContent(
-            type="text",
-            text=output_text
-        )]
-
-    elif name == "get_user_info":
-        user = await discord_client.fetch_user(int(arguments["user_id"]))
-        user_info = {
-            "id": str(user.id),
-            "name": user.name,
-            "discriminator": user.discriminator,
-            "bot": user.bot,
-            "created_at": user.created_at.isoformat()
-        }
-        return [TextContent(
-            type="text",
-            text=f"User information:\n" + 
-                 f"Name: {user_info['name']}#{user_info['discriminator']}\n" +
-                 f"ID: {user_info['id']}\n" +
-                 f"Bot: {user_info['bot']}\n" +
-                 f"Created: {user_info['created_at']}"
-        )]
-
-    elif name == "moderate_message":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        message = await channel.fetch_message(int(arguments["message_id"]))
-        
-        # Delete the message
-        await message.delete(reason=arguments["reason"])
-        
-        # Handle timeout if specified
-        if "timeout_minutes" in arguments and arguments["timeout_minutes"] > 0:
-            if isinstance(message.author, discord.Member):
-                duration = discord.utils.utcnow() + datetime.timedelta(
-                    minutes=arguments["timeout_minutes"]
-                )
-                await message.author.timeout(
-                    duration,
-                    reason=arguments["reason"]
-                )
-                return [TextContent(
-                    type="text",
-                    text=f"Message deleted and user timed out for {arguments['timeout_minutes']} minutes."
-                )]
-        
-        return [TextContent(
-            type="text",
-            text="Message deleted successfully."
-        )]
-
-    # Server Information Tools
-    elif name == "get_server_info":
-        guild = await discord_client.fetch_guild(int(arguments["server_id"]))
-        info = {
-            "name": guild.name,
-            "id": str(guild.id),
-            "owner_id": str(guild.owner_id),
-            "member_count": guild.member_count,
-            "created_at": guild.created_at.isoformat(),
-            "description": guild.description,
-            "premium_tier": guild.premium_tier,
-            "explicit_content_filter": str(guild.explicit_content_filter)
-        }
-        return [TextContent(
-            type="text",
-            text=f"Server Information:\n" + "\n".join(f"{k}: {v}" for k, v in info.items())
-        )]
-
-    elif name == "list_members":
-        guild = await discord_client.fetch_guild(int(arguments["server_id"]))
-        limit = min(int(arguments.get("limit", 100)), 1000)
-        
-        members = []
-        async for member in guild.fetch_members(limit=limit):
-            members.append({
-                "id": str(member.id),
-                "name": member.name,
-                "nick": member.nick,
-                "joined_at": member.joined_at.isoformat() if member.joined_at else None,
-                "roles": [str(role.id) for role in member.roles[1:]]  # Skip @everyone
-            })
-        
-        return [TextContent(
-            type="text",
-            text=f"Server Members ({len(members)}):\n" + 
-                 "\n".join(f"{m['name']} (ID: {m['id']}, Roles: {', '.join(m['roles'])})" for m in members)
-        )]
-    elif name == "list_servers":
-        servers = []
-        for guild in discord_client.guilds:
-            servers.append({
-                "id": str(guild.id),
-                "name": guild.name,
-                "member_count": guild.member_count,
-                "created_at": guild.created_at.isoformat()
-            })
-        
-        return [TextContent(
-            type="text",
-            text=f"Available Servers ({len(servers)}):\n" + 
-                "\n".join(f"{s['name']} (ID: {s['id']}, Members: {s['member_count']})" for s in servers)
-        )]
-
-    # Role Management Tools
-    elif name == "add_role":
-        guild = await discord_client.fetch_guild(int(arguments["server_id"]))
-        member = await guild.fetch_member(int(arguments["user_id"]))
-        role = guild.get_role(int(arguments["role_id"]))
-        
-        await member.add_roles(role, reason="Role added via MCP")
-        return [TextContent(
-            type="text",
-            text=f"Added role {role.name} to user {member.name}"
-        )]
-
-    elif name == "remove_role":
-        guild = await discord_client.fetch_guild(int(arguments["server_id"]))
-        member = await guild.fetch_member(int(arguments["user_id"]))
-        role = guild.get_role(int(arguments["role_id"]))
-        
-        await member.remove_roles(role, reason="Role removed via MCP")
-        return [TextContent(
-            type="text",
-            text=f"Removed role {role.name} from user {member.name}"
-        )]
-
-    # Channel Management Tools
-    elif name == "create_text_channel":
-        guild = await discord_client.fetch_guild(int(arguments["server_id"]))
-        category = None
-        if "category_id" in arguments:
-            category = guild.get_channel(int(arguments["category_id"]))
+    # Prepare kwargs for message sending
+    kwargs = {}
+    if "content" in arguments:
+        kwargs["content"] = arguments["content"]
+    
+    # Handle embeds if provided
+    embeds = arguments.get("embeds")
+    if embeds:
+        kwargs["embeds"] = _build_embeds(embeds)
+    
+    message = await channel.send(**kwargs)
+    return _text(f"Message sent successfully. Message ID: {message.id}")
+
+def _emoji_str(emoji: Any) -> str:
+    # Reaction emoji are plain str for Unicode, Emoji/PartialEmoji otherwise
+    if isinstance(emoji, str):
+        return emoji
+    name = getattr(emoji, "name", None)
+    return name if name else str(getattr(emoji, "id", emoji))
+
+def _write_embed(write: Callable[[str], Any], index: int, embed: discord.Embed) -> None:
+    write(f"\n  Embed {index}:")
+    if embed.title:
+        write(f"\n    Title: {embed.title}")
+    if embed.description:
+        write(f"\n    Description: {embed.description}")
+    if embed.url:
+        write(f"\n    URL: {embed.url}")
+    # These properties build a fresh EmbedProxy on every access; read each once
+    color = embed.color
+    if color and color.value:
+        write(f"\n    Color: {color.value}")
+    timestamp = embed.timestamp
+    if timestamp:
+        write(f"\n    Timestamp: {timestamp.isoformat()}")
+    author = embed.author
+    if author:
+        write(f"\n    Author: {author.name}")
+    footer = embed.footer
+    if footer:
+        write(f"\n    Footer: {footer.text}")
+    thumbnail = embed.thumbnail
+    if thumbnail:
+        write(f"\n    Thumbnail: {thumbnail.url}")
+    image = embed.image
+    if image:
+        write(f"\n    Image: {image.url}")
+    fields = embed.fields
+    if fields:
+        write("\n    Fields:")
+        for field in fields:
+            write(f"\n      {field.name}: {field.value} ({'Inline' if field.inline else 'Not inline'})")
+
+async def _handle_read_messages(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    channel = await _resolve_channel(client, arguments["channel_id"])
+    limit = min(int(arguments.get("limit", 10)), 100)
+    
+    # Format straight from each message into one growable buffer
+    buf = io.StringIO()
+    write = buf.write
+    count = 0
+    async for message in channel.history(limit=limit):
+        if count:
+            write("\n━━━━━━━━━━━━━━━━━━━━━━\n")  # Separator for clarity
+        count += 1
         
-        channel = await guild.create_text_channel(
-            name=arguments["name"],
-            category=category,
-            topic=arguments.get("topic"),
-            reason="Channel created via MCP"
+        reactions = [f"{_emoji_str(reaction.emoji)}({reaction.count})" for reaction in message.reactions]
+        write(f"{message.author} ({message.created_at.isoformat()}): {message.content}\n"
+              f"Reactions: {', '.join(reactions) if reactions else 'No reactions'}")
+        if message.embeds:
+            write("\nEmbeds:")
+            for i, embed in enumerate(message.embeds, 1):
+                _write_embed(write, i, embed)
+
+    return _text(f"Retrieved {count} messages:\n\n" + buf.getvalue())
+
+async def _handle_get_user_info(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    # Not _resolve_user: its REST cache would keep serving the name from the
+    # first lookup
+    user_id = arguments["user_id"]
+    user = client.get_user(user_id) or await client.fetch_user(user_id)
+    return _text(f"User information:\n"
+                 f"Name: {user.name}#{user.discriminator}\n"
+                 f"ID: {user.id}\n"
+                 f"Bot: {user.bot}\n"
+                 f"Created: {user.created_at.isoformat()}")
+
+async def _handle_moderate_message(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    reason = arguments["reason"]
+    timeout_minutes = arguments.get("timeout_minutes") or 0
+    
+    channel = await _resolve_channel(client, arguments["channel_id"])
+    message = await channel.fetch_message(arguments["message_id"])
+    
+    # Delete the message
+    await message.delete(reason=reason)
+    
+    # Handle timeout if specified; only once the delete has succeeded
+    if timeout_minutes > 0 and isinstance(message.author, discord.Member):
+        await message.author.timeout(timedelta(minutes=timeout_minutes), reason=reason)
+        return _text(f"Message deleted and user timed out for {timeout_minutes} minutes.")
+    
+    return _text("Message deleted successfully.")
+
+# Server Information Tools
+async def _handle_get_server_info(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    guild = await _resolve_guild(client, arguments["server_id"])
+    return _text(f"Server Information:\n"
+                 f"name: {guild.name}\n"
+                 f"id: {guild.id}\n"
+                 f"owner_id: {guild.owner_id}\n"
+                 f"member_count: {guild.member_count}\n"
+                 f"created_at: {guild.created_at.isoformat()}\n"
+                 f"description: {guild.description}\n"
+                 f"premium_tier: {guild.premium_tier}\n"
+                 f"explicit_content_filter: {guild.explicit_content_filter}")
+
+def _format_member(member: discord.Member, include_roles: bool) -> str:
+    if not include_roles:
+        return f"{member.name} (ID: {member.id})"
+    # @everyone shares the guild's ID; skip it without slicing a copy of roles
+    everyone_id = member.guild.id
+    roles = ", ".join([str(role.id) for role in member.roles if role.id != everyone_id])
+    return f"{member.name} (ID: {member.id}, Roles: {roles})"
+
+async def _handle_list_members(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    guild = await _resolve_guild(client, arguments["server_id"])
+    limit = min(int(arguments.get("limit", 100)), 1000)
+    include_roles = arguments.get("include_roles", True)
+    
+    members = [
+        _format_member(member, include_roles)
+        async for member in guild.fetch_members(limit=limit)
+    ]
+    
+    return _text(f"Server Members ({len(members)}):\n" + "\n".join(members))
+
+async def _handle_list_servers(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    guilds = client.guilds
+    body = "\n".join(f"{g.name} (ID: {g.id}, Members: {g.member_count})" for g in guilds)
+    return _text(f"Available Servers ({len(guilds)}):\n{body}")
+
+# Role Management Tools
+async def _handle_add_role(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    guild = await _resolve_guild(client, arguments["server_id"])
+    member = await _resolve_member(guild, arguments["user_id"])
+    role = guild.get_role(arguments["role_id"])
+    
+    await member.add_roles(role, reason="Role added via MCP")
+    return _text(f"Added role {role.name} to user {member.name}")
+
+async def _handle_remove_role(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    guild = await _resolve_guild(client, arguments["server_id"])
+    member = await _resolve_member(guild, arguments["user_id"])
+    role = guild.get_role(arguments["role_id"])
+    
+    await member.remove_roles(role, reason="Role removed via MCP")
+    return _text(f"Removed role {role.name} from user {member.name}")
+
+# Channel Management Tools
+async def _handle_create_text_channel(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    guild = await _resolve_guild(client, arguments["server_id"])
+    category_id = arguments.get("category_id")
+    category = guild.get_channel(category_id) if category_id else None
+    
+    channel = await guild.create_text_channel(
+        name=arguments["name"],
+        category=category,
+        topic=arguments.get("topic"),
+        reason="Channel created via MCP"
+    )
+    
+    return _text(f"Created text channel #{channel.name} (ID: {channel.id})")
+
+async def _handle_delete_channel(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    channel = await _resolve_channel(client, arguments["channel_id"])
+    await channel.delete(reason=arguments.get("reason", "Channel deleted via MCP"))
+    return _text(f"Deleted channel successfully")
+
+# Message Reaction Tools
+# Reacting only needs the channel and message IDs, so these use a
+# PartialMessage rather than fetching the message first
+async def _handle_add_reaction(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    emoji = arguments["emoji"]
+    channel = await _resolve_channel(client, arguments["channel_id"])
+    message = channel.get_partial_message(arguments["message_id"])
+    await message.add_reaction(emoji)
+    return _text(f"Added reaction {emoji} to message")
+
+async def _handle_add_multiple_reactions(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    emojis = arguments["emojis"]
+    channel = await _resolve_channel(client, arguments["channel_id"])
+    message = channel.get_partial_message(arguments["message_id"])
+    # discord.py queues these on the reaction route's rate limit bucket, so
+    # issuing them together lets it pace the requests instead of us. Collect
+    # every outcome: one bad emoji doesn't stop the others from being added
+    results = await asyncio.gather(
+        *(message.add_reaction(emoji) for emoji in emojis),
+        return_exceptions=True
+    )
+    failed = [
+        f"{emoji} ({result})"
+        for emoji, result in zip(emojis, results)
+        if isinstance(result, BaseException)
+    ]
+    if failed:
+        added = len(emojis) - len(failed)
+        raise RuntimeError(
+            f"Failed to add reactions: {', '.join(failed)}. "
+            f"Added {added} of {len(emojis)} reactions to message"
         )
-        
-        return [TextContent(
-            type="text",
-            text=f"Created text channel #{channel.name} (ID: {channel.id})"
-        )]
-
-    elif name == "delete_channel":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        await channel.delete(reason=arguments.get("reason", "Channel deleted via MCP"))
-        return [TextContent(
-            type="text",
-            text=f"Deleted channel successfully"
-        )]
-
-    # Message Reaction Tools
-    elif name == "add_reaction":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        message = await channel.fetch_message(int(arguments["message_id"]))
-        await message.add_reaction(arguments["emoji"])
-        return [TextContent(
-            type="text",
-            text=f"Added reaction {arguments['emoji']} to message"
-        )]
-
-    elif name == "add_multiple_reactions":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        message = await channel.fetch_message(int(arguments["message_id"]))
-        for emoji in arguments["emojis"]:
-            await message.add_reaction(emoji)
-        return [TextContent(
-            type="text",
-            text=f"Added reactions: {', '.join(arguments['emojis'])} to message"
-        )]
-
-    elif name == "remove_reaction":
-        channel = await discord_client.fetch_channel(int(arguments["channel_id"]))
-        message = await channel.fetch_message(int(arguments["message_id"]))
-        await message.remove_reaction(arguments["emoji"], discord_client.user)
-        return [TextContent(
-            type="text",
-            text=f"Removed reaction {arguments['emoji']} from message"
-        )]
+    # Echo back at most the first few emojis; the count covers the rest
+    shown = ", ".join(emojis[:10])
+    if len(emojis) > 10:
+        shown += f" ... ({len(emojis)} total)"
+    return _text(f"Added reactions: {shown} to message")
+
+async def _handle_remove_reaction(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    emoji = arguments["emoji"]
+    channel = await _resolve_channel(client, arguments["channel_id"])
+    message = channel.get_partial_message(arguments["message_id"])
+    await message.remove_reaction(emoji, client.user)
+    return _text(f"Removed reaction {emoji} from message")
+
+# DM Tools
+# Reply for Forbidden code 50007 (Cannot send messages to this user)
+_DM_FORBIDDEN_TEMPLATE = (
+    "Error: Cannot send DM to {name}. Possible reasons:\n"
+    "1. The user has blocked the bot\n"
+    "2. The user has their privacy settings set to not receive DMs from non-friends\n"
+    "3. The bot doesn't share a mutual server with this user\n\n"
+    "Solution: Make sure the bot and user share a server and that the user's privacy settings "
+    "allow DMs from server members."
+)
+
+async def _handle_send_dm(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    user = await _resolve_user(client, arguments["user_id"])
+    dm_channel = user.dm_channel or await user.create_dm()
     
-    # DM Tools
-    elif name == "send_dm":
-        user = await discord_client.fetch_user(int(arguments["user_id"]))
-        dm_channel = await user.create_dm()
-        
-        # Prepare kwargs for message sending
-        kwargs = {}
-        if "content" in arguments:
-            kwargs["content"] = arguments["content"]
-        
-        # Handle embeds if provided
-        if "embeds" in arguments and arguments["embeds"]:
-            embeds = []
-            for embed_data in arguments["embeds"]:
-                embed = discord.Embed()
-                
-                # Set basic embed properties
-                if "title" in embed_data:
-                    embed.title = embed_data["title"]
-                if "description" in embed_data:
-                    embed.description = embed_data["description"]
-                if "url" in embed_data:
-                    embed.url = embed_data["url"]
-                if "color" in embed_data:
-                    embed.color = embed_data["color"]
-                if "timestamp" in embed_data and embed_data["timestamp"]:
-                    embed.timestamp = datetime.fromisoformat(embed_data["timestamp"])
-                
-                # Set author if provided
-                if "author" in embed_data:
-                    name = embed_data["author"].get("name", "")
-                    url = embed_data["author"].get("url", None)
-                    icon_url = embed_data["author"].get("icon_url", None)
-                    embed.set_author(name=name, url=url, icon_url=icon_url)
-                
-                # Set footer if provided
-                if "footer" in embed_data:
-                    text = embed_data["footer"].get("text", "")
-                    icon_url = embed_data["footer"].get("icon_url", None)
-                    embed.set_footer(text=text, icon_url=icon_url)
-                
-                # Set thumbnail if provided
-                if "thumbnail" in embed_data and "url" in embed_data["thumbnail"]:
-                    embed.set_thumbnail(url=embed_data["thumbnail"]["url"])
-                
-                # Set image if provided
-                if "image" in embed_data and "url" in embed_data["image"]:
-                    embed.set_image(url=embed_data["image"]["url"])
-                
-                # Add fields if provided
-                if "fields" in embed_data:
-                    for field in embed_data["fields"]:
-                        embed.add_field(
-                            name=field.get("name", ""),
-                            value=field.get("value", ""),
-                            inline=field.get("inline", False)
-                        )
-                
-                embeds.append(embed)
-            
-            kwargs["embeds"] = embeds
-        
-        try:
-            message = await dm_channel.send(**kwargs)
-            return [TextContent(
-                type="text",
-                text=f"DM sent successfully to {user.name}. Message ID: {message.id}"
-            )]
-        except discord.errors.Forbidden as e:
-            if e.code == 50007:
-                return [TextContent(
-                    type="text",
-                    text=f"Error: Cannot send DM to {user.name}. Possible reasons:\n"
-                         f"1. The user has blocked the bot\n"
-                         f"2. The user has their privacy settings set to not receive DMs from non-friends\n"
-                         f"3. The bot doesn't share a mutual server with this user\n\n"
-                         f"Solution: Make sure the bot and user share a server and that the user's privacy settings "
-                         f"allow DMs from server members."
-                )]
-            else:
-                raise
+    # Prepare kwargs for message sending
+    kwargs = {}
+    if "content" in arguments:
+        kwargs["content"] = arguments["content"]
     
-    elif name == "dm_conversation":
-        user = await discord_client.fetch_user(int(arguments["user_id"]))
-        dm_channel = await user.create_dm()
-        timeout = int(arguments.get("timeout", 60))
-        
-        # Prepare kwargs for message sending
-        kwargs = {}
-        if "content" in arguments:
-            kwargs["content"] = arguments["content"]
-        
-        # Handle embeds if provided
-        if "embeds" in arguments and arguments["embeds"]:
-            embeds = []
-            for embed_data in arguments["embeds"]:
-                embed = discord.Embed()
-                
-                # Set basic embed properties
-                if "title" in embed_data:
-                    embed.title = embed_data["title"]
-                if "description" in embed_data:
-                    embed.description = embed_data["description"]
-                if "url" in embed_data:
-                    embed.url = embed_data["url"]
-                if "color" in embed_data:
-                    embed.color = embed_data["color"]
-                if "timestamp" in embed_data and embed_data["timestamp"]:
-                    embed.timestamp = datetime.fromisoformat(embed_data["timestamp"])
-                
-                # Set author if provided
-                if "author" in embed_data:
-                    name = embed_data["author"].get("name", "")
-                    url = embed_data["author"].get("url", None)
-                    icon_url = embed_data["author"].get("icon_url", None)
-                    embed.set_author(name=name, url=url, icon_url=icon_url)
-                
-                # Set footer if provided
-                if "footer" in embed_data:
-                    text = embed_data["footer"].get("text", "")
-                    icon_url = embed_data["footer"].get("icon_url", None)
-                    embed.set_footer(text=text, icon_url=icon_url)
-                
-                # Set thumbnail if provided
-                if "thumbnail" in embed_data and "url" in embed_data["thumbnail"]:
-                    embed.set_thumbnail(url=embed_data["thumbnail"]["url"])
-                
-                # Set image if provided
-                if "image" in embed_data and "url" in embed_data["image"]:
-                    embed.set_image(url=embed_data["image"]["url"])
-                
-                # Add fields if provided
-                if "fields" in embed_data:
-                    for field in embed_data["fields"]:
-                        embed.add_field(
-                            name=field.get("name", ""),
-                            value=field.get("value", ""),
-                            inline=field.get("inline", False)
-                        )
-                
-                embeds.append(embed)
-            
-            kwargs["embeds"] = embeds
+    # Handle embeds if provided
+    embeds = arguments.get("embeds")
+    if embeds:
+        kwargs["embeds"] = _build_embeds(embeds)
+    
+    try:
+        message = await dm_channel.send(**kwargs)
+        return _text(f"DM sent successfully to {user.name}. Message ID: {message.id}")
+    except discord.errors.Forbidden as e:
+        if e.code == 50007:
+            return _text(_DM_FORBIDDEN_TEMPLATE.format(name=user.name))
+        else:
+            raise
+
+async def _handle_dm_conversation(client: commands.Bot, arguments: Any) -> List[TextContent]:
+    user_id = arguments["user_id"]
+    user = await _resolve_user(client, user_id)
+    dm_channel = user.dm_channel or await user.create_dm()
+    timeout = int(arguments.get("timeout", 60))
+    
+    # Prepare kwargs for message sending
+    kwargs = {}
+    if "content" in arguments:
+        kwargs["content"] = arguments["content"]
+    
+    # Handle embeds if provided
+    embeds = arguments.get("embeds")
+    if embeds:
+        kwargs["embeds"] = _build_embeds(embeds)
+    
+    # Register for the reply before sending so a quick answer isn't missed
+    key = (dm_channel.id, user_id)
+    waiter = asyncio.get_running_loop().create_future()
+    _dm_waiters.setdefault(key, []).append(waiter)
+    
+    try:
+        # Send the message
+        sent_message = await dm_channel.send(**kwargs)
         
         try:
-            # Send the message
-            sent_message = await dm_channel.send(**kwargs)
+            # Wait for the response with timeout
+            response = await asyncio.wait_for(waiter, timeout)
             
-            # Define a check function to filter messages
-            def check(message):
-                return message.author.id == int(arguments["user_id"]) and message.channel.id == dm_channel.id
+            # Prepare the sent message content for display
+            sent_content = sent_message.content if sent_message.content else "Embed message"
             
-            try:
-                # Wait for the response with timeout
-                response = await discord_client.wait_for('message', check=check, timeout=timeout)
-                
-                # Prepare the sent message content for display
-                sent_content = sent_message.content if sent_message.content else "Embed message"
-                
-                return [TextContent(
-                    type="text",
-                    text=(f"DM conversation with {user.name}:\n"
+            return _text(f"DM conversation with {user.name}:\n"
                          f"Bot: {sent_content}\n"
                          f"{user.name}: {response.content}\n"
                          f"Response received at: {response.created_at.isoformat()}")
-                )]
-            except asyncio.TimeoutError:
-                return [TextContent(
-                    type="text",
-                    text=f"DM sent to {user.name}, but they did not respond within {timeout} seconds."
-                )]
-        except discord.errors.Forbidden as e:
-            if e.code == 50007:
-                return [TextContent(
-                    type="text",
-                    text=f"Error: Cannot send DM to {user.name}. Possible reasons:\n"
-                         f"1. The user has blocked the bot\n"
-                         f"2. The user has their privacy settings set to not receive DMs from non-friends\n"
-                         f"3. The bot doesn't share a mutual server with this user\n\n"
-                         f"Solution: Make sure the bot and user share a server and that the user's privacy settings "
-                         f"allow DMs from server members."
-                )]
-            else:
-                raise
-
-    raise ValueError(f"Unknown tool: {name}")
-
-async def main():
-    # Start Discord bot in the background
-    asyncio.create_task(bot.start(DISCORD_TOKEN))
-    
-    # Run MCP server
+        except asyncio.TimeoutError:
+            return _text(f"DM sent to {user.name}, but they did not respond within {timeout} seconds.")
+    except discord.errors.Forbidden as e:
+        if e.code == 50007:
+            return _text(_DM_FORBIDDEN_TEMPLATE.format(name=user.name))
+        else:
+            raise
+    finally:
+        waiters = _dm_waiters.get(key)
+        if waiters and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del _dm_waiters[key]
+
+# Map tool names to their handlers for O(1) dispatch in call_tool
+_HANDLERS: Dict[str, Callable[[commands.Bot, Any], Awaitable[List[TextContent]]]] = {
+    "send_message": _handle_send_message,
+    "read_messages": _handle_read_messages,
+    "get_user_info": _handle_get_user_info,
+    "moderate_message": _handle_moderate_message,
+    "get_server_info": _handle_get_server_info,
+    "list_members": _handle_list_members,
+    "list_servers": _handle_list_servers,
+    "add_role": _handle_add_role,
+    "remove_role": _handle_remove_role,
+    "create_text_channel": _handle_create_text_channel,
+    "delete_channel": _handle_delete_channel,
+    "add_reaction": _handle_add_reaction,
+    "add_multiple_reactions": _handle_add_multiple_reactions,
+    "remove_reaction": _handle_remove_reaction,
+    "send_dm": _handle_send_dm,
+    "dm_conversation": _handle_dm_conversation,
+}
+
+# Required arguments per tool, read once from the schemas so call_tool can
+# reject incomplete calls with a clear message instead of a KeyError
+_REQUIRED_FIELDS = {
+    tool.name: tuple(tool.inputSchema.get("required", ()))
+    for tool in _TOOLS
+}
+
+# Every *_id argument is a Discord snowflake; parse them once in call_tool so
+# malformed IDs fail before a handler does any work. Each entry pairs the
+# argument name with whether the tool requires it.
+_ID_FIELDS = {
+    tool.name: tuple(
+        (prop, prop in _REQUIRED_FIELDS[tool.name])
+        for prop in tool.inputSchema["properties"]
+        if prop.endswith("_id")
+    )
+    for tool in _TOOLS
+}
+
+@app.call_tool()
+async def call_tool(name: str, arguments: Any) -> List[TextContent]:
+    """Handle Discord tool calls."""
+    client = discord_client
+    if client is None:
+        raise RuntimeError("Discord client not ready")
+    handler = _HANDLERS.get(name)
+    if handler is None:
+        raise ValueError(f"Unknown tool: {name}")
+    missing = [field for field in _REQUIRED_FIELDS[name] if field not in arguments]
+    if missing:
+        raise ValueError(f"Missing required arguments for {name}: {', '.join(missing)}")
+    for field, required in _ID_FIELDS[name]:
+        value = arguments.get(field)
+        # An optional ID left empty means "not given" (e.g. no category)
+        if not required and not value:
+            continue
+        try:
+            arguments[field] = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be a Discord ID") from None
+    return await handler(client, arguments)
+
+async def _run_mcp():
     async with stdio_server() as (read_stream, write_stream):
         await app.run(
             read_stream,
@@ -1012,6 +873,31 @@ async def main():
             app.create_initialization_options()
         )
 
+# The SDK reads stdin in a worker thread that can't be cancelled, so while the
+# host keeps stdin open the MCP session cannot finish after cancel(); shutdown
+# waits this long for it before leaving it behind
+_MCP_CANCEL_TIMEOUT = 1.0
+
+async def main(stop: Optional[asyncio.Future] = None):
+    # Run the Discord bot and the MCP server side by side; when either one
+    # ends (or a shutdown is requested) the other is brought down with it
+    bot_task = asyncio.create_task(bot.start(DISCORD_TOKEN))
+    mcp_task = asyncio.create_task(_run_mcp())
+    waiters = (bot_task, mcp_task) if stop is None else (bot_task, mcp_task, stop)
+    try:
+        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        mcp_task.cancel()
+        # Log out and close discord.py's HTTP session and gateway socket
+        await bot.close()
+        await asyncio.wait((bot_task,))
+        await asyncio.wait((mcp_task,), timeout=_MCP_CANCEL_TIMEOUT)
+
+    # Surface a failure from either side instead of leaving it unretrieved
+    for task in (bot_task, mcp_task):
+        if task.done() and not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+
 if __name__ == "__main__":
     asyncio.run(main())
 